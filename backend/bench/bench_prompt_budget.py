@@ -0,0 +1,247 @@
+"""
+Бенчмарк сжатия промпта генерации вопросов на корпусе длинных вакансий.
+
+Запуск (из каталога backend):
+    PYTHONPATH=src python bench/bench_prompt_budget.py
+    PYTHONPATH=src python bench/bench_prompt_budget.py --live --limit 5   # реальные вызовы, нужен OPENAI_API_KEY
+
+Без --live считаются токены промпта до/после сжатия и стоимость по тарифу gpt-4o-mini.
+Латентность без --live не измеряется, а моделируется линейно:
+base + prefill * prompt_tokens + decode * completion_tokens. Коэффициенты по умолчанию —
+грубые допущения, а не замеры; задаются аргументами. Размер ответа одинаковый для обоих
+вариантов, так что смоделированный выигрыш идет только от входных токенов.
+Фактическую латентность дает только --live: для каждой вакансии делается вызов со старым
+(полным) и новым промптом. Результаты --live в репозитории пока не зафиксированы.
+
+В заголовке отчета указан режим токенизатора: o200k_base (файл AI_TOKENIZER_FILE) или
+приблизительный подсчет по символам — во втором случае числа токенов тоже оценочные.
+
+Корпус состоит из двух групп:
+- docx: типичные выгрузки из DOCX со стандартными заголовками («Мы предлагаем», «О компании»)
+  и повторами требований — на них работают дедупликация и чистка «воды»;
+- long: вакансии заметно больше бюджета, с формулировками условий, которые регулярные
+  выражения не знают, — на них работает приоритетная обрезка.
+"""
+import argparse
+import random
+import statistics
+import time
+
+from app.services.prompt_budget import (
+    PROMPT_TOKEN_BUDGET,
+    QUESTIONS_PROMPT_TEMPLATE,
+    build_questions_prompt,
+    count_tokens,
+    tokenizer_mode,
+)
+
+# Тариф gpt-4o-mini, $ за 1M токенов
+INPUT_PRICE_PER_M = 0.15
+OUTPUT_PRICE_PER_M = 0.60
+
+# Типичный размер ответа на 7 вопросов; используется для обоих вариантов
+COMPLETION_TOKENS_ESTIMATE = 700
+
+_SKILLS = [
+    "Опыт коммерческой разработки на Python от 3 лет",
+    "Уверенное знание SQL и опыт работы с PostgreSQL",
+    "Опыт работы с FastAPI или Django",
+    "Понимание принципов REST и проектирования API",
+    "Опыт работы с Docker и docker-compose",
+    "Знание git и опыт code review",
+    "Опыт написания unit- и интеграционных тестов (pytest)",
+    "Понимание асинхронного программирования (asyncio)",
+    "Опыт работы с очередями сообщений (Kafka, RabbitMQ)",
+    "Знание основ Linux и bash",
+    "Опыт настройки CI/CD (GitLab CI)",
+    "Умение читать техническую документацию на английском",
+    "Опыт работы с Redis",
+    "Понимание принципов ООП и SOLID",
+    "Опыт профилирования и оптимизации производительности",
+]
+
+_DUTIES = [
+    "Разработка и поддержка микросервисов платформы розничного кредитования.",
+    "Проектирование схем данных и оптимизация запросов к БД.",
+    "Участие в архитектурных обсуждениях и планировании спринтов.",
+    "Написание автотестов и поддержка покрытия кода.",
+    "Интеграция с внутренними и внешними сервисами банка.",
+    "Разбор инцидентов и участие в дежурствах.",
+    "Менторство младших разработчиков команды.",
+    "Подготовка технической документации по разработанным сервисам.",
+]
+
+_DOCX_BOILERPLATE = [
+    "Мы предлагаем:",
+    "Официальное трудоустройство по ТК РФ с первого дня",
+    "Конкурентная заработная плата и годовой бонус",
+    "ДМС со стоматологией, страхование жизни",
+    "Дружный коллектив профессионалов",
+    "Комфортный офис в центре города, бесплатный кофе",
+    "О компании:",
+    "Мы — один из крупнейших банков страны с многолетней историей и миллионами клиентов.",
+    "Будем рады видеть вас в нашей команде! Ждем ваше резюме.",
+]
+
+# Для группы long: слова, из которых собираются уникальные пункты, и условия,
+# сформулированные иначе, чем в регулярных выражениях prompt_budget
+_TECH = ["Python", "Go", "Java", "PostgreSQL", "ClickHouse", "Kafka", "Kubernetes", "Terraform",
+         "Airflow", "Spark", "gRPC", "GraphQL", "Elasticsearch", "Prometheus", "Grafana", "Vault"]
+_SKILL_PATTERNS = [
+    "Практический опыт использования {} в продакшене",
+    "Умение диагностировать проблемы производительности {}",
+    "Понимание внутреннего устройства {} и его ограничений",
+    "Опыт миграции сервисов на {}",
+]
+_DUTY_PATTERNS = [
+    "Развитие внутренней платформы на базе {} для команд продуктовой разработки.",
+    "Сопровождение и масштабирование кластеров {} под растущую нагрузку.",
+    "Автоматизация рутинных операций вокруг {} и снижение ручного труда.",
+    "Совместная с аналитиками проработка требований к сервисам на {}.",
+]
+_UNMATCHED_PERKS = [
+    "Что вы получите, присоединившись к нам",
+    "Медицинская страховка для вас и членов семьи с первого месяца",
+    "Ежегодный пересмотр дохода по результатам работы",
+    "Компенсация спорта, изучения языков и профильных курсов",
+    "Возможность работать из любой точки страны",
+    "Современная техника на выбор: ноутбук и два монитора",
+    "Команда, в которой ценят открытость и взаимопомощь",
+    "Наш банк входит в топ-10 работодателей по версии профильных рейтингов.",
+]
+
+
+def make_docx_vacancy(rng: random.Random) -> dict:
+    """Выгрузка из DOCX: повторы требований между разделами и стандартный блок условий."""
+    skills = rng.sample(_SKILLS, k=rng.randint(8, len(_SKILLS)))
+    skills += [s.upper() if rng.random() < 0.3 else s for s in rng.sample(skills, k=len(skills) // 2)]
+    requirements = "\n".join(f"• {s};" for s in skills) + "\n" + "\n".join(_DOCX_BOILERPLATE)
+
+    duties = _DUTIES * rng.randint(2, 4)
+    rng.shuffle(duties)
+    description = " ".join(duties) + "\n" + "\n".join(_DOCX_BOILERPLATE)
+    return {"title": "Backend-разработчик Python", "description": description, "requirements": requirements}
+
+
+def make_long_vacancy(rng: random.Random) -> dict:
+    """Вакансия заметно больше бюджета: уникальные пункты и нестандартно сформулированные условия."""
+    pairs = [(p, t) for p in _SKILL_PATTERNS for t in _TECH]
+    skills = [p.format(t) for p, t in rng.sample(pairs, k=rng.randint(30, 50))]
+    requirements = "\n".join(f"{i}. {s}" for i, s in enumerate(skills, 1))
+
+    pairs = [(p, t) for p in _DUTY_PATTERNS for t in _TECH]
+    duties = [p.format(t) for p, t in rng.sample(pairs, k=rng.randint(25, 45))]
+    description = " ".join(duties) + "\n" + "\n".join(_UNMATCHED_PERKS)
+    return {"title": "Platform-инженер", "description": description, "requirements": requirements}
+
+
+def baseline_prompt(vacancy: dict, n: int) -> str:
+    return QUESTIONS_PROMPT_TEMPLATE.format(n=n, **vacancy)
+
+
+def cost(prompt_tokens: int, completion_tokens: int) -> float:
+    return (prompt_tokens * INPUT_PRICE_PER_M + completion_tokens * OUTPUT_PRICE_PER_M) / 1_000_000
+
+
+def estimate_latency_ms(args, prompt_tokens: int, completion_tokens: int) -> float:
+    return args.base_ms + args.prefill_ms_per_token * prompt_tokens + args.decode_ms_per_token * completion_tokens
+
+
+def call_model(prompt: str, max_tokens=None):
+    import openai
+    import os
+
+    openai.api_key = os.getenv("OPENAI_API_KEY")
+    kwargs = {"max_tokens": max_tokens} if max_tokens else {}
+    started = time.perf_counter()
+    response = openai.ChatCompletion.create(
+        model="gpt-4o-mini",
+        messages=[{"role": "user", "content": prompt}],
+        temperature=0.7,
+        **kwargs,
+    )
+    latency_ms = (time.perf_counter() - started) * 1000
+    usage = response["usage"]
+    return latency_ms, usage["prompt_tokens"], usage["completion_tokens"]
+
+
+def report(args, label: str, corpus: list):
+    baseline_tokens = []
+    compacted_tokens = []
+    build_ms = []
+    truncated = 0
+    max_tokens = None
+    for vacancy in corpus:
+        baseline_tokens.append(count_tokens(baseline_prompt(vacancy, args.n)))
+        started = time.perf_counter()
+        questions_prompt = build_questions_prompt(n=args.n, **vacancy)
+        build_ms.append((time.perf_counter() - started) * 1000)
+        compacted_tokens.append(questions_prompt.prompt_tokens)
+        truncated += questions_prompt.compacted_input_tokens < questions_prompt.original_input_tokens
+        max_tokens = questions_prompt.max_tokens
+
+    completion = COMPLETION_TOKENS_ESTIMATE
+    base_cost = sum(cost(t, completion) for t in baseline_tokens)
+    new_cost = sum(cost(t, completion) for t in compacted_tokens)
+    base_latency = [estimate_latency_ms(args, t, completion) for t in baseline_tokens]
+    # Сборку промпта честно добавляем к латентности нового варианта
+    new_latency = [estimate_latency_ms(args, t, completion) + b for t, b in zip(compacted_tokens, build_ms)]
+
+    print(f"[{label}] {len(corpus)} вакансий, сжато {truncated}, max_tokens={max_tokens}")
+    print(f"  Промпт, токенов (среднее/макс): было {statistics.mean(baseline_tokens):.0f}/{max(baseline_tokens)}, "
+          f"стало {statistics.mean(compacted_tokens):.0f}/{max(compacted_tokens)} "
+          f"(-{100 * (1 - sum(compacted_tokens) / sum(baseline_tokens)):.1f}%)")
+    print(f"  Стоимость (ответ {completion} ток. в обоих вариантах): было ${base_cost:.5f}, "
+          f"стало ${new_cost:.5f} (-{100 * (1 - new_cost / base_cost):.1f}%)")
+    print(f"  Латентность, МОДЕЛЬ мс (p50/max): было {statistics.median(base_latency):.0f}/{max(base_latency):.0f}, "
+          f"стало {statistics.median(new_latency):.0f}/{max(new_latency):.0f} "
+          f"(-{100 * (1 - sum(new_latency) / sum(base_latency)):.1f}%)")
+    print(f"  Сборка промпта, мс (p50/max): {statistics.median(build_ms):.2f}/{max(build_ms):.2f}")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--corpus-size", type=int, default=25, help="вакансий в каждой группе")
+    parser.add_argument("--n", type=int, default=7)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--base-ms", type=float, default=300.0, help="накладные расходы на вызов, мс")
+    parser.add_argument("--prefill-ms-per-token", type=float, default=0.15)
+    parser.add_argument("--decode-ms-per-token", type=float, default=12.0)
+    parser.add_argument("--live", action="store_true")
+    parser.add_argument("--limit", type=int, default=5, help="сколько вакансий из каждой группы прогонять в --live")
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    groups = {
+        "docx": [make_docx_vacancy(rng) for _ in range(args.corpus_size)],
+        "long": [make_long_vacancy(rng) for _ in range(args.corpus_size)],
+    }
+
+    print(f"Токенизатор: {tokenizer_mode()}")
+    print(f"Бюджет промпта: {PROMPT_TOKEN_BUDGET} токенов, n={args.n}")
+    print(f"Латентность без --live смоделирована: base={args.base_ms} мс, "
+          f"prefill={args.prefill_ms_per_token} мс/ток., decode={args.decode_ms_per_token} мс/ток. (не замер)")
+    for label, corpus in groups.items():
+        report(args, label, corpus)
+
+    if not args.live:
+        return
+
+    for label, corpus in groups.items():
+        rows = []
+        for vacancy in corpus[: args.limit]:
+            questions_prompt = build_questions_prompt(n=args.n, **vacancy)
+            rows.append((
+                call_model(baseline_prompt(vacancy, args.n)),
+                call_model(questions_prompt.prompt, questions_prompt.max_tokens),
+            ))
+
+        for variant, idx in (("было", 0), ("стало", 1)):
+            latencies = [r[idx][0] for r in rows]
+            live_cost = sum(cost(r[idx][1], r[idx][2]) for r in rows)
+            print(f"[{label}] live {variant}: латентность p50 {statistics.median(latencies):.0f} мс, "
+                  f"max {max(latencies):.0f} мс, стоимость ${live_cost:.5f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -9,12 +9,14 @@ from sqlalchemy.orm import selectinload
 
 from .db import init_db
 from .routers import nlp, vacancies, questions
+from .services.prompt_budget import load_tokenizer
 
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     await init_db()
+    load_tokenizer()
     yield
 
 app = FastAPI(
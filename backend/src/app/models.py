@@ -95,3 +95,28 @@ class QuestionAISuggestion(SQLModel):
     question_text: str
     competence: str
     weight: float
+
+
+
+# Модель записи об ИИ-вызове ДЛЯ ТАБЛИЦЫ БД (расход токенов и латентность)
+class AICallLog(SQLModel, table=True):
+    id: Optional[int] = Field(default=None, primary_key=True)
+    kind: str  # Тип вызова: vacancy_suggestions / questions_suggestions
+    # Без внешнего ключа: статистика остается и после удаления вакансии
+    vacancy_id: Optional[int] = Field(default=None, index=True)
+    prompt_tokens: int
+    completion_tokens: int
+    latency_ms: float
+    max_tokens: Optional[int] = None
+    finish_reason: Optional[str] = None
+    created_at: datetime = Field(default_factory=datetime.now)
+
+
+# Учет токенов и латентности ИИ-вызовов по вакансии
+class AIUsageResponse(SQLModel):
+    vacancy_id: int
+    calls: int
+    prompt_tokens: int
+    completion_tokens: int
+    total_tokens: int
+    avg_latency_ms: float
@@ -6,6 +6,7 @@ from sqlmodel.ext.asyncio.session import AsyncSession
 from ..models import *
 from ..db import get_session
 from ..services.ai_service import get_questions_ai_suggestions
+from ..services.ai_usage import save_ai_usage
 
 
 
@@ -20,15 +21,20 @@ async def get_question_suggestions(vacancy_id: int, session: AsyncSession = Depe
     if not vacancy:
         raise HTTPException(status_code=404, detail="Vacancy not found")
 
+    usage_log = []
     try:
         ai_questions = get_questions_ai_suggestions(
             title=vacancy.vacancy_title or "",
             description=vacancy.description or "",
             requirements=vacancy.requirements or "",
+            vacancy_id=vacancy.id,
+            usage_log=usage_log,
         )
     except Exception as e:
         print(f"AI question suggestions error: {e}")
-        return []
+        ai_questions = []
+
+    await save_ai_usage(usage_log)
 
     return [QuestionAISuggestion(**q) for q in ai_questions]
 
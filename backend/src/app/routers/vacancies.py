@@ -8,6 +8,7 @@ from sqlalchemy.orm import selectinload
 from ..models import *
 from ..db import get_session
 from ..services.ai_service import generate_ai_vacancy_suggestions
+from ..services.ai_usage import get_vacancy_usage, save_ai_usage
 
 
 
@@ -93,11 +94,18 @@ async def create_vacancy_function(vacancy: VacancyCreate, session: AsyncSession
 
 
     ai_data = {"description": None, "requirements": None, "salary": None}
+    usage_log = []
     try:
-        ai_data = generate_ai_vacancy_suggestions(new_vacancy.vacancy_title)
+        ai_data = generate_ai_vacancy_suggestions(
+            new_vacancy.vacancy_title,
+            vacancy_id=new_vacancy.id,
+            usage_log=usage_log,
+        )
     except Exception as e:
         print(f"AI suggestion error: {e}")
 
+    await save_ai_usage(usage_log)
+
 
     return VacancyResponseAI(
         id=new_vacancy.id,
@@ -185,3 +193,7 @@ async def delete_vacancy(vacancy_id: int, session: AsyncSession = Depends(get_se
     )
 
 
+
+@router.get("/vacancies/{vacancy_id}/ai_usage", tags=["Получение и редактирование вакансий"], summary = "Расход токенов и латентность ИИ-вызовов по вакансии", description="Суммы по всем сохраненным вызовам к ИИ для вакансии (таблица aicalllog), включая уже удаленные вакансии. Для вакансии без вызовов возвращаются нули.", response_model=AIUsageResponse)
+async def get_vacancy_ai_usage(vacancy_id: int, session: AsyncSession = Depends(get_session)):
+    return await get_vacancy_usage(session, vacancy_id)
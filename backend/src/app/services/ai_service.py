@@ -1,11 +1,67 @@
 import openai
 import json
-from typing import Dict, Any
+import time
+from typing import Dict, Any, List, Optional
 import os
 
+from ..models import AICallLog
+from .prompt_budget import build_questions_prompt, count_tokens
+
 openai.api_key = os.getenv("OPENAI_API_KEY")
 
-def generate_ai_vacancy_suggestions(title: str) -> Dict[str, Any]:
+
+def _chat_completion(
+    prompt: str,
+    kind: str,
+    vacancy_id: Optional[int],
+    max_tokens: Optional[int] = None,
+    usage_log: Optional[List[AICallLog]] = None,
+) -> str:
+    """
+    Вызов модели с замером латентности и учетом токенов.
+    Записи о вызовах добавляются в usage_log, сохраняет их вызывающий код.
+    Если ответ уперся в max_tokens, повторяет вызов один раз с удвоенным лимитом.
+    """
+    for attempt in range(2):
+        kwargs = {"max_tokens": max_tokens} if max_tokens else {}
+        started = time.perf_counter()
+        response = openai.ChatCompletion.create(
+            model="gpt-4o-mini",
+            messages=[{"role": "user", "content": prompt}],
+            temperature=0.7,
+            **kwargs,
+        )
+        latency_ms = (time.perf_counter() - started) * 1000
+
+        choice = response.choices[0]
+        content = choice.message.content.strip()
+        finish_reason = choice.get("finish_reason")
+        usage = response.get("usage") or {}
+        call = AICallLog(
+            kind=kind,
+            vacancy_id=vacancy_id,
+            prompt_tokens=usage.get("prompt_tokens") or count_tokens(prompt),
+            completion_tokens=usage.get("completion_tokens") or count_tokens(content),
+            latency_ms=latency_ms,
+            max_tokens=max_tokens,
+            finish_reason=finish_reason,
+        )
+        if usage_log is not None:
+            usage_log.append(call)
+
+        if finish_reason != "length" or not max_tokens or attempt > 0:
+            break
+        print(f"AI call {kind}: response truncated at max_tokens={max_tokens}, retrying")
+        max_tokens *= 2
+
+    return content
+
+
+def generate_ai_vacancy_suggestions(
+    title: str,
+    vacancy_id: Optional[int] = None,
+    usage_log: Optional[List[AICallLog]] = None,
+) -> Dict[str, Any]:
     prompt = f"""
 Ты — HR-ассистент. По названию вакансии: "{title}"
 Сгенерируй JSON с ключами:
@@ -22,13 +78,7 @@ def generate_ai_vacancy_suggestions(title: str) -> Dict[str, Any]:
 }}
     """
     try:
-        # ИСПРАВЛЕНО: используй openai.ChatCompletion.create (старый синтаксис)
-        response = openai.ChatCompletion.create(
-            model="gpt-4o-mini",
-            messages=[{"role": "user", "content": prompt}],
-            temperature=0.7,
-        )
-        content = response.choices[0].message.content.strip()
+        content = _chat_completion(prompt, "vacancy_suggestions", vacancy_id, usage_log=usage_log)
         return json.loads(content)
     except Exception as e:
         print(f"AI vacancy generation error: {e}")
@@ -39,36 +89,26 @@ def generate_ai_vacancy_suggestions(title: str) -> Dict[str, Any]:
 
 
 
-def get_questions_ai_suggestions(title: str, description: str, requirements: str, n: int = 7):
-    prompt = f"""
-Ты — профессиональный HR-ассистент с опытом планирования и проведения собеседований, в том числе технических. У тебя есть вакансия:
-
-Название: "{title}"
-
-Описание:
-{description}
-
-Требования:
-{requirements}
-
-Сгенерируй {n} вопросов для собеседования — от вводных до технических.
-Для каждого вопроса укажи:
-- question_text: сам вопрос (строка)
-- competence: какую компетенцию проверяет (строка)
-- weight: важность от 0 до 1 (число с плавающей точкой)
-
-Верни строго JSON-массив объектов без лишнего текста.
-    """
+def get_questions_ai_suggestions(
+    title: str,
+    description: str,
+    requirements: str,
+    n: int = 7,
+    vacancy_id: Optional[int] = None,
+    usage_log: Optional[List[AICallLog]] = None,
+):
+    # Описание и требования сжимаются до бюджета AI_PROMPT_TOKEN_BUDGET
+    questions_prompt = build_questions_prompt(title, description, requirements, n)
 
     try:
-        response = openai.ChatCompletion.create(
-            model="gpt-4o-mini",
-            messages=[{"role": "user", "content": prompt}],
-            temperature=0.7,
+        content = _chat_completion(
+            questions_prompt.prompt,
+            "questions_suggestions",
+            vacancy_id,
+            questions_prompt.max_tokens,
+            usage_log,
         )
 
-        content = response.choices[0].message.content.strip()
-
         # Убираем возможное оформление
         content = content.strip("` \n")
         if content.lower().startswith("json"):
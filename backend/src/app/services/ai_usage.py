@@ -0,0 +1,46 @@
+from typing import List
+
+from sqlalchemy import func
+from sqlalchemy.ext.asyncio import AsyncSession as SAAsyncSession
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from ..db import engine
+from ..models import AICallLog, AIUsageResponse
+
+
+async def save_ai_usage(usage_log: List[AICallLog]) -> None:
+    """
+    Сохраняет записи об ИИ-вызовах в отдельной короткой сессии, чтобы сбой записи
+    статистики не откатывал и не expire'ил объекты сессии основного запроса.
+    Ошибка записи (включая rollback при закрытии сессии) только логируется.
+    """
+    if not usage_log:
+        return
+    try:
+        async with SAAsyncSession(engine, expire_on_commit=False) as session:
+            session.add_all(usage_log)
+            await session.commit()
+    except Exception as e:
+        print(f"AI usage save error: {e}")
+
+
+async def get_vacancy_usage(session: AsyncSession, vacancy_id: int) -> AIUsageResponse:
+    result = await session.execute(
+        select(
+            func.count(AICallLog.id),
+            func.coalesce(func.sum(AICallLog.prompt_tokens), 0),
+            func.coalesce(func.sum(AICallLog.completion_tokens), 0),
+            func.coalesce(func.avg(AICallLog.latency_ms), 0.0),
+        ).where(AICallLog.vacancy_id == vacancy_id)
+    )
+    calls, prompt_tokens, completion_tokens, avg_latency_ms = result.one()
+
+    return AIUsageResponse(
+        vacancy_id=vacancy_id,
+        calls=calls,
+        prompt_tokens=prompt_tokens,
+        completion_tokens=completion_tokens,
+        total_tokens=prompt_tokens + completion_tokens,
+        avg_latency_ms=float(avg_latency_ms),
+    )
@@ -0,0 +1,370 @@
+import base64
+import math
+import os
+import re
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+
+# Бюджет токенов для промпта генерации вопросов (шаблон + описание + требования)
+PROMPT_TOKEN_BUDGET = int(os.getenv("AI_PROMPT_TOKEN_BUDGET", "1200"))
+# Доля бюджета входных данных, которая в первую очередь отдается требованиям
+REQUIREMENTS_SHARE = float(os.getenv("AI_PROMPT_REQUIREMENTS_SHARE", "0.6"))
+# Лимит ответа: токенов на один вопрос + накладные расходы на JSON-массив.
+# Типичный вопрос в ответе занимает 80-100 токенов, берем с запасом, чтобы не обрезать JSON
+TOKENS_PER_QUESTION = int(os.getenv("AI_TOKENS_PER_QUESTION", "150"))
+COMPLETION_OVERHEAD_TOKENS = int(os.getenv("AI_COMPLETION_OVERHEAD_TOKENS", "60"))
+
+# Словарь токенизатора gpt-4o / gpt-4o-mini (o200k_base.tiktoken). Файл скачивается при
+# сборке образа (см. Dockerfile) и читается только с диска. Если файла нет, используется
+# приблизительный подсчет по символам.
+TOKENIZER_FILE = os.getenv("AI_TOKENIZER_FILE", "/opt/tiktoken/o200k_base.tiktoken")
+
+# Регулярное выражение разбиения текста для o200k_base. Скопировано из
+# tiktoken_ext/openai_public.py (tiktoken==0.7.0, см. requirements.txt) — при обновлении
+# tiktoken сверить с функцией o200k_base()
+_O200K_PAT_STR = "|".join([
+    r"""[^\r\n\p{L}\p{N}]?[\p{Lu}\p{Lt}\p{Lm}\p{Lo}\p{M}]*[\p{Ll}\p{Lm}\p{Lo}\p{M}]+(?i:'s|'t|'re|'ve|'m|'ll|'d)?""",
+    r"""[^\r\n\p{L}\p{N}]?[\p{Lu}\p{Lt}\p{Lm}\p{Lo}\p{M}]+[\p{Ll}\p{Lm}\p{Lo}\p{M}]*(?i:'s|'t|'re|'ve|'m|'ll|'d)?""",
+    r"""\p{N}{1,3}""",
+    r""" ?[^\s\p{L}\p{N}]+[\r\n/]*""",
+    r"""\s*[\r\n]+""",
+    r"""\s+(?!\S)""",
+    r"""\s+""",
+])
+_O200K_SPECIAL_TOKENS = {"<|endoftext|>": 199999, "<|endofprompt|>": 200018}
+
+# Для кириллицы o200k_base дает в среднем ~3 символа на токен — считаем с запасом
+_FALLBACK_CHARS_PER_TOKEN = 3
+
+_encoding = None
+_encoding_loaded = False
+
+
+QUESTIONS_PROMPT_TEMPLATE = """
+Ты — профессиональный HR-ассистент с опытом планирования и проведения собеседований, в том числе технических. У тебя есть вакансия:
+
+Название: "{title}"
+
+Описание:
+{description}
+
+Требования:
+{requirements}
+
+Сгенерируй {n} вопросов для собеседования — от вводных до технических.
+Для каждого вопроса укажи:
+- question_text: сам вопрос (строка)
+- competence: какую компетенцию проверяет (строка)
+- weight: важность от 0 до 1 (число с плавающей точкой)
+
+Верни строго JSON-массив объектов без лишнего текста.
+    """
+
+
+# Заголовки блоков с условиями и рекламой компании
+_BOILERPLATE_HEADINGS = re.compile(
+    r"^(мы предлагаем|что мы предлагаем|условия|условия работы|о компании|о нас|"
+    r"наши преимущества|бонусы|льготы|почему мы)\b",
+    re.IGNORECASE,
+)
+
+# Заголовки содержательных разделов — закрывают блок условий
+_SECTION_HEADINGS = re.compile(
+    r"^(обязанности|задачи|чем (предстоит|нужно|ты будешь|вы будете) заниматься|что нужно делать|"
+    r"требования|что мы (ждем|ждём|ожидаем)|мы (ждем|ждём|ожидаем)|ключевые навыки|навыки|"
+    r"будет плюсом|будет преимуществом|стек|технологии|описание)\b",
+    re.IGNORECASE,
+)
+
+# Заголовок — короткая строка: длиннее считаем обычным пунктом
+_MAX_HEADING_WORDS = 6
+
+# Отдельные пункты, которые не помогают сформулировать вопросы к кандидату
+_BOILERPLATE_ITEMS = re.compile(
+    r"(официальное трудоустройство|трудоустройство по тк|белая (заработная плата|зарплата)|"
+    r"конкурентн\w+ (заработн\w+ плат\w+|зарплат\w+|уровень дохода)|\bдмс\b|"
+    r"дружн\w+ (коллектив|команд\w+)|комфортн\w+ офис|бесплатн\w+ (кофе|обеды|питание)|"
+    r"корпоративн\w+ (мероприяти\w+|праздник\w+)|"
+    r"будем рады|ждем (ваше|твое|твоё) резюме|ждём (ваше|твое|твоё) резюме|"
+    r"откликайтесь|присоединяйтесь)",
+    re.IGNORECASE,
+)
+
+_ITEM_SPLIT = re.compile(r"[\n;•·▪●]+")
+_ITEM_MARKER = re.compile(r"^\s*(?:[-–—*]+|\d+[.)])\s*")
+_NUMBERED_ITEM = re.compile(r"^\s*\d{1,2}[.)]\s")
+_INLINE_NUMBER_SPLIT = re.compile(r"\s+(?=\d{1,2}[.)]\s)")
+_SENTENCE_SPLIT = re.compile(r"(?<=[.!?])\s+")
+
+
+@dataclass
+class CompactedVacancy:
+    description: str
+    requirements: str
+    original_tokens: int
+    compacted_tokens: int
+
+
+@dataclass
+class QuestionsPrompt:
+    prompt: str
+    prompt_tokens: int
+    max_tokens: int
+    original_input_tokens: int
+    compacted_input_tokens: int
+
+
+def _read_tiktoken_file(path: str) -> Dict[bytes, int]:
+    # Формат .tiktoken: по строке "<base64 токена> <ранг>"
+    with open(path, "rb") as f:
+        return {
+            base64.b64decode(token): int(rank)
+            for token, rank in (line.split() for line in f.read().splitlines() if line)
+        }
+
+
+def _load_encoding(path: str):
+    if not os.path.exists(path):
+        print(f"Tokenizer file {path} not found, using approximate token count")
+        return None
+    try:
+        import tiktoken
+        return tiktoken.Encoding(
+            name="o200k_base",
+            pat_str=_O200K_PAT_STR,
+            mergeable_ranks=_read_tiktoken_file(path),
+            special_tokens=_O200K_SPECIAL_TOKENS,
+        )
+    except Exception as e:
+        print(f"Tokenizer load error, using approximate token count: {e}")
+        return None
+
+
+def load_tokenizer():
+    """Загружает токенизатор из TOKENIZER_FILE. Вызывается при старте приложения."""
+    global _encoding, _encoding_loaded
+    if not _encoding_loaded:
+        _encoding_loaded = True
+        _encoding = _load_encoding(TOKENIZER_FILE)
+    return _encoding
+
+
+def tokenizer_mode() -> str:
+    return "o200k_base" if load_tokenizer() is not None else f"approximate (chars/{_FALLBACK_CHARS_PER_TOKEN})"
+
+
+def _get_encoding():
+    return load_tokenizer()
+
+
+def count_tokens(text: str) -> int:
+    if not text:
+        return 0
+    encoding = _get_encoding()
+    if encoding is None:
+        return math.ceil(len(text) / _FALLBACK_CHARS_PER_TOKEN)
+    return len(encoding.encode_ordinary(text))
+
+
+def truncate_to_tokens(text: str, max_tokens: int) -> str:
+    if max_tokens <= 0:
+        return ""
+    encoding = _get_encoding()
+    if encoding is None:
+        return text[: max_tokens * _FALLBACK_CHARS_PER_TOKEN]
+    tokens = encoding.encode_ordinary(text)
+    if len(tokens) <= max_tokens:
+        return text
+    return encoding.decode(tokens[:max_tokens]).rstrip()
+
+
+def split_items(text: str) -> List[str]:
+    """Разбивает текст на пункты по строкам, ';' и маркерам списков."""
+    items = []
+    for line in _ITEM_SPLIT.split(text or ""):
+        # Нумерованный список в одну строку: "1) Опыт Python 2) Знание SQL"
+        parts = _INLINE_NUMBER_SPLIT.split(line) if _NUMBERED_ITEM.match(line) else [line]
+        for raw in parts:
+            item = _ITEM_MARKER.sub("", raw).strip()
+            if item:
+                items.append(item)
+    return items
+
+
+def _normalize_item(item: str) -> str:
+    item = re.sub(r"[^\w\s+#]", " ", item.lower())
+    return re.sub(r"\s+", " ", item).strip()
+
+
+def dedupe_items(items: List[str]) -> List[str]:
+    seen = set()
+    result = []
+    for item in items:
+        key = _normalize_item(item)
+        if not key or key in seen:
+            continue
+        seen.add(key)
+        result.append(item)
+    return result
+
+
+def _heading_key(item: str) -> Optional[str]:
+    """Возвращает текст заголовка, если пункт — заголовок раздела, иначе None."""
+    key = item.strip().rstrip(":").strip()
+    if not key or len(key.split()) > _MAX_HEADING_WORDS:
+        return None
+    if item.rstrip().endswith(":"):
+        return key
+    # Без двоеточия — только точное совпадение с известным заголовком
+    for pattern in (_BOILERPLATE_HEADINGS, _SECTION_HEADINGS):
+        match = pattern.match(key)
+        if match and match.end() == len(key):
+            return key
+    return None
+
+
+def remove_boilerplate(items: List[str], drop_perk_items: bool = False) -> List[str]:
+    """
+    Убирает блоки «Мы предлагаем», «О компании». Блок условий длится до следующего
+    заголовка раздела. С drop_perk_items убирает и отдельные пункты про условия
+    (ДМС, дружный коллектив) — только для описания: в требованиях такие слова бывают
+    частью настоящего требования. Если после чистки ничего не осталось, возвращает пункты как есть.
+    """
+    result = []
+    in_boilerplate_block = False
+    for item in items:
+        heading = _heading_key(item)
+        if heading is not None:
+            in_boilerplate_block = bool(_BOILERPLATE_HEADINGS.match(heading))
+            if in_boilerplate_block:
+                continue
+        elif in_boilerplate_block:
+            continue
+        # Заголовок и содержимое в одной строке: "Мы предлагаем: ДМС, офис"
+        inline_heading, sep, _ = item.partition(":")
+        if sep and _BOILERPLATE_HEADINGS.match(inline_heading.strip()) \
+                and len(inline_heading.split()) <= _MAX_HEADING_WORDS:
+            continue
+        if drop_perk_items and _BOILERPLATE_ITEMS.search(item):
+            continue
+        result.append(item)
+    return result or list(items)
+
+
+def _take_items(items: List[str], budget: int) -> List[str]:
+    """Берет пункты по порядку (первые важнее), пока они помещаются в бюджет."""
+    taken = []
+    used = 0
+    for item in items:
+        cost = count_tokens(item) + 1
+        if used + cost > budget:
+            rest = budget - used - 1
+            # Длинный пункт обрезаем, только если от него останется осмысленный кусок
+            if rest >= 16 or not taken:
+                tail = truncate_to_tokens(item, rest)
+                if " " in tail:
+                    tail = tail.rsplit(" ", 1)[0]
+                if tail:
+                    taken.append(tail + "…")
+            break
+        taken.append(item)
+        used += cost
+    return taken
+
+
+def _items_tokens(items: List[str]) -> int:
+    # +1 токен на перевод строки между пунктами
+    return sum(count_tokens(i) + 1 for i in items)
+
+
+def _split_sentences(items: List[str]) -> List[str]:
+    sentences = []
+    for item in items:
+        sentences.extend(s for s in _SENTENCE_SPLIT.split(item) if s)
+    return sentences
+
+
+def _render(description_items: List[str], requirement_lines: List[str]):
+    return "\n".join(description_items), "\n".join(requirement_lines)
+
+
+def compact_vacancy_text(description: str, requirements: str, budget: int) -> CompactedVacancy:
+    """
+    Сжимает описание и требования вакансии до budget токенов.
+    Текст, который помещается в бюджет, не меняется. Иначе по очереди: убираем повторы,
+    затем «воду» про условия, затем обрезаем. Требования приоритетнее описания.
+    """
+    original_tokens = count_tokens(description) + count_tokens(requirements)
+    if original_tokens <= budget:
+        return CompactedVacancy(
+            description=description,
+            requirements=requirements,
+            original_tokens=original_tokens,
+            compacted_tokens=original_tokens,
+        )
+
+    requirement_items = dedupe_items(split_items(requirements))
+    description_items = dedupe_items(_split_sentences(split_items(description)))
+
+    # Требования считаем в том виде, в котором они попадут в промпт
+    if _items_tokens([f"- {i}" for i in requirement_items]) + _items_tokens(description_items) > budget:
+        requirement_items = remove_boilerplate(requirement_items)
+        description_items = remove_boilerplate(description_items, drop_perk_items=True)
+    requirement_lines = [f"- {i}" for i in requirement_items]
+
+    description_tokens = _items_tokens(description_items)
+    if _items_tokens(requirement_lines) + description_tokens > budget:
+        requirements_budget = max(int(budget * REQUIREMENTS_SHARE), budget - description_tokens)
+        requirement_lines = _take_items(requirement_lines, requirements_budget)
+        description_items = _take_items(description_items, budget - _items_tokens(requirement_lines))
+
+    # Сумма по пунктам — оценка; проверяем итоговый текст и при перерасходе
+    # убираем последние пункты, сначала из описания
+    compacted_description, compacted_requirements = _render(description_items, requirement_lines)
+    compacted_tokens = count_tokens(compacted_description) + count_tokens(compacted_requirements)
+    while compacted_tokens > budget and (description_items or requirement_lines):
+        if description_items:
+            description_items = description_items[:-1]
+        else:
+            requirement_lines = requirement_lines[:-1]
+        compacted_description, compacted_requirements = _render(description_items, requirement_lines)
+        compacted_tokens = count_tokens(compacted_description) + count_tokens(compacted_requirements)
+
+    return CompactedVacancy(
+        description=compacted_description,
+        requirements=compacted_requirements,
+        original_tokens=original_tokens,
+        compacted_tokens=compacted_tokens,
+    )
+
+
+def max_tokens_for_questions(n: int) -> int:
+    return n * TOKENS_PER_QUESTION + COMPLETION_OVERHEAD_TOKENS
+
+
+def build_questions_prompt(
+    title: str,
+    description: str,
+    requirements: str,
+    n: int = 7,
+    budget: Optional[int] = None,
+) -> QuestionsPrompt:
+    budget = PROMPT_TOKEN_BUDGET if budget is None else budget
+    template_tokens = count_tokens(
+        QUESTIONS_PROMPT_TEMPLATE.format(title=title, description="", requirements="", n=n)
+    )
+    compacted = compact_vacancy_text(description, requirements, max(budget - template_tokens, 0))
+
+    prompt = QUESTIONS_PROMPT_TEMPLATE.format(
+        title=title,
+        description=compacted.description,
+        requirements=compacted.requirements,
+        n=n,
+    )
+    return QuestionsPrompt(
+        prompt=prompt,
+        prompt_tokens=count_tokens(prompt),
+        max_tokens=max_tokens_for_questions(n),
+        original_input_tokens=compacted.original_tokens,
+        compacted_input_tokens=compacted.compacted_tokens,
+    )
@@ -0,0 +1,122 @@
+import base64
+
+import pytest
+
+from app.services import prompt_budget as pb
+from app.services.prompt_budget import (
+    build_questions_prompt,
+    compact_vacancy_text,
+    count_tokens,
+    dedupe_items,
+    max_tokens_for_questions,
+    remove_boilerplate,
+    split_items,
+)
+
+
+@pytest.fixture(autouse=True)
+def approximate_tokenizer(monkeypatch):
+    # Приблизительный подсчет по символам: тесты не зависят от файла словаря
+    monkeypatch.setattr(pb, "_encoding", None)
+    monkeypatch.setattr(pb, "_encoding_loaded", True)
+
+
+def test_split_items_bullets_and_semicolons():
+    assert split_items("• Python;\n- SQL\n* Docker") == ["Python", "SQL", "Docker"]
+
+
+def test_split_items_inline_numbered_list():
+    assert split_items("1) Опыт 2) Знание") == ["Опыт", "Знание"]
+    assert split_items("1. Python 2. SQL 3. Kafka") == ["Python", "SQL", "Kafka"]
+
+
+def test_split_items_keeps_versions_and_numbers():
+    assert split_items("Python 3.11; опыт от 3 лет") == ["Python 3.11", "опыт от 3 лет"]
+
+
+def test_dedupe_items_ignores_case_and_punctuation():
+    assert dedupe_items(["Опыт SQL", "ОПЫТ SQL;", "Kafka"]) == ["Опыт SQL", "Kafka"]
+
+
+def test_remove_boilerplate_block_closed_by_heading_without_colon():
+    items = ["О компании", "Мы крупный банк.", "Обязанности", "Разработка микросервисов"]
+    assert remove_boilerplate(items) == ["Обязанности", "Разработка микросервисов"]
+
+
+def test_remove_boilerplate_long_item_is_not_heading():
+    items = ["Условия работы с высоконагруженными системами", "Python 3", "SQL"]
+    assert remove_boilerplate(items) == items
+
+
+def test_remove_boilerplate_inline_heading_drops_only_its_line():
+    assert remove_boilerplate(["Мы предлагаем: ДМС, офис", "Опыт SQL", "Kafka"]) == ["Опыт SQL", "Kafka"]
+
+
+def test_remove_boilerplate_perk_items_only_on_request():
+    items = ["Требования:", "Опыт работы в дружной команде разработчиков", "Python"]
+    assert remove_boilerplate(items) == items
+    assert remove_boilerplate(items, drop_perk_items=True) == ["Требования:", "Python"]
+
+
+def test_remove_boilerplate_never_empties_field():
+    items = ["О компании", "Мы банк"]
+    assert remove_boilerplate(items) == items
+
+
+def test_compact_under_budget_is_unchanged():
+    description = "О компании\nМы банк.\n• Разработка"
+    requirements = "1) Python 2) Python"
+    compacted = compact_vacancy_text(description, requirements, 1000)
+    assert compacted.description == description
+    assert compacted.requirements == requirements
+    assert compacted.compacted_tokens == compacted.original_tokens
+
+
+def test_compact_over_budget_fits_and_keeps_first_requirements():
+    requirements = "\n".join(f"Опыт работы с технологией X{i}" for i in range(60))
+    description = " ".join(f"Задача номер {i} про сервис {i}." for i in range(60))
+    compacted = compact_vacancy_text(description, requirements, 300)
+
+    assert compacted.compacted_tokens <= 300
+    assert compacted.requirements.startswith("- Опыт работы с технологией X0\n")
+    # Требования приоритетнее: им достается большая часть бюджета
+    assert count_tokens(compacted.requirements) > count_tokens(compacted.description) > 0
+
+
+def test_compact_truncates_long_item_on_word_boundary():
+    requirements = " ".join(f"слово{i}" for i in range(200))
+    compacted = compact_vacancy_text("", requirements, 60)
+
+    assert compacted.compacted_tokens <= 60
+    assert compacted.requirements.endswith("…")
+    last_word = compacted.requirements[:-1].split()[-1]
+    assert last_word in requirements.split()
+
+
+def test_build_questions_prompt_respects_budget():
+    requirements = "\n".join(f"Навык {i}: опыт с технологией X{i}" for i in range(300))
+    questions_prompt = build_questions_prompt("Разработчик", "Описание. " * 400, requirements, 5, budget=800)
+
+    assert questions_prompt.prompt_tokens <= 800
+    assert questions_prompt.compacted_input_tokens < questions_prompt.original_input_tokens
+    assert questions_prompt.max_tokens == max_tokens_for_questions(5)
+
+
+def test_max_tokens_for_questions_leaves_headroom():
+    # Типичный ответ на 7 вопросов ~700 токенов — лимит не должен его обрезать
+    assert max_tokens_for_questions(7) == 7 * pb.TOKENS_PER_QUESTION + pb.COMPLETION_OVERHEAD_TOKENS
+    assert max_tokens_for_questions(7) >= 1000
+
+
+def test_load_encoding_from_tiktoken_file(tmp_path):
+    # Побайтовый словарь: каждый байт — отдельный токен
+    path = tmp_path / "bytes.tiktoken"
+    path.write_text("\n".join(f"{base64.b64encode(bytes([i])).decode()} {i}" for i in range(256)))
+
+    encoding = pb._load_encoding(str(path))
+    text = "Привет <|endoftext|>"
+    assert len(encoding.encode_ordinary(text)) == len(text.encode())
+
+
+def test_load_encoding_missing_file(tmp_path):
+    assert pb._load_encoding(str(tmp_path / "missing.tiktoken")) is None